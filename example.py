@@ -5,6 +5,8 @@ This script shows how to use the optimizer with different types of questions
 and displays the routing and cost optimization decisions.
 """
 
+import asyncio
+
 from src.main import LLMCostOptimizer
 
 
@@ -22,7 +24,7 @@ def main():
     print()
     
     # Initialize optimizer
-    optimizer = LLMCostOptimizer(max_escalations=1)
+    optimizer = LLMCostOptimizer(max_escalations=1, verbose=True)
     
     # Sample questions covering different difficulty levels
     sample_questions = [
@@ -39,12 +41,22 @@ def main():
         "Analyze the trade-offs between consistency, availability, and partition tolerance in distributed systems, provide concrete examples, and explain how different architectures make different choices.",
     ]
     
-    results = []
+    # Process all questions concurrently (LLM calls overlap instead of waiting in turn)
+    # Trace lines are labelled Q1, Q2, ... since the questions' steps interleave
+    results = asyncio.run(optimizer.aprocess_many(sample_questions))
+    
+    # Display each question's outcome once all of them are done
+    print("\n" + "="*70)
+    print("RESULTS")
+    print("="*70)
     
-    # Process each question
-    for question in sample_questions:
-        result = optimizer.process_question(question, verbose=True)
-        results.append(result)
+    for number, result in enumerate(results, 1):
+        route = result["initial_model"]
+        if result["final_model"] != route:
+            route += f" -> {result['final_model']}"
+        print(f"\nQ{number}: {result['question'][:60]}")
+        print(f"  • Model: {route}  Escalations: {result['escalations']}  "
+              f"Quality: {result['quality_score']:.2f}  Cost: ${result['estimated_cost']:.6f}")
     
     # Display summary statistics
     print("\n" + "="*70)
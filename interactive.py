@@ -6,7 +6,7 @@ of difficulty estimation, routing decisions, and cost calculations.
 """
 
 from src.main import LLMCostOptimizer
-from src.router import estimate_difficulty, select_model, get_model_config
+from src.router import analyze
 
 
 def show_transparent_analysis(question: str):
@@ -14,14 +14,15 @@ def show_transparent_analysis(question: str):
     Show transparent step-by-step analysis of how difficulty is estimated.
     
     This helps users understand WHY a question was routed to a particular model.
+    The breakdown comes from the same router.analyze() call the optimizer
+    uses, so what is shown is exactly what drives routing.
     """
     print("\n" + "="*80)
     print("TRANSPARENT DIFFICULTY ANALYSIS")
     print("="*80)
     
-    # Break down the difficulty estimation
-    question_length = len(question.split())
-    question_lower = question.lower()
+    report = analyze(question)
+    question_length = report.question_length
     
     print(f"\nQuestion: \"{question}\"")
     print(f"Length: {question_length} words")
@@ -29,64 +30,45 @@ def show_transparent_analysis(question: str):
     # Analyze length
     print("\n[1] LENGTH HEURISTIC:")
     if question_length < 5:
-        length_score = 0.1
         print(f"    • {question_length} words < 5 → Very short, likely simple → +0.1")
     elif question_length < 15:
-        length_score = 0.3
         print(f"    • {question_length} words between 5-15 → Medium difficulty → +0.3")
     elif question_length < 30:
-        length_score = 0.5
         print(f"    • {question_length} words between 15-30 → Longer, more complex → +0.5")
     else:
-        length_score = 0.7
         print(f"    • {question_length} words > 30 → Very long, likely complex → +0.7")
     
     # Analyze keywords
     print("\n[2] KEYWORD HEURISTIC:")
-    complex_keywords = [
-        "explain", "how", "why", "analyze", "compare", "contrast",
-        "evaluate", "summarize", "discuss", "implement", "design",
-        "algorithm", "complex", "optimization", "technical"
-    ]
-    
-    found_keywords = [kw for kw in complex_keywords if kw in question_lower]
-    keyword_score = len(found_keywords) * 0.1
+    found_keywords = list(report.found_keywords)
     
     if found_keywords:
         print(f"    • Found keywords: {found_keywords}")
-        print(f"    • {len(found_keywords)} keyword(s) × 0.1 = +{keyword_score}")
+        print(f"    • {len(found_keywords)} keyword(s) × 0.1 = +{report.keyword_score}")
     else:
         print(f"    • No complex keywords found → +0.0")
     
     # Analyze punctuation
     print("\n[3] PUNCTUATION HEURISTIC:")
-    punct_score = 0.0
-    question_count = question.count("?")
-    comma_count = question.count(",")
-    
-    if question_count > 1:
-        punct_score += 0.15
-        print(f"    • Multiple questions ({question_count} ?) → +0.15")
+    if report.question_marks > 1:
+        print(f"    • Multiple questions ({report.question_marks} ?) → +0.15")
     
-    if ";" in question or comma_count > 3:
-        punct_score += 0.1
-        print(f"    • Multiple parts (commas: {comma_count}, semicolons: {';' in question}) → +0.1")
+    if report.has_semicolon or report.commas > 3:
+        print(f"    • Multiple parts (commas: {report.commas}, semicolons: {report.has_semicolon}) → +0.1")
     
-    if punct_score == 0:
+    if report.punct_score == 0:
         print(f"    • No special punctuation → +0.0")
     
-    # Calculate final score
-    difficulty = length_score + keyword_score + punct_score
-    difficulty = min(difficulty, 1.0)  # Cap at 1.0
+    # Final score
+    difficulty = report.difficulty
     
     print("\n" + "-"*80)
     print(f"TOTAL DIFFICULTY SCORE: {difficulty:.2f}/1.0")
     print("-"*80)
     
     # Show routing decision
-    model = select_model(difficulty)
     print(f"\nROUTING DECISION:")
-    if difficulty < 0.5:
+    if report.model == "small":
         print(f"  • Difficulty {difficulty:.2f} < 0.5 (threshold)")
         print(f"  • Route to: SMALL MODEL (cheaper, faster)")
         print(f"  • Cost: $0.0005 per 1k tokens")
@@ -118,7 +100,7 @@ def main():
     print("="*80)
     
     # Initialize optimizer
-    optimizer = LLMCostOptimizer(max_escalations=1)
+    optimizer = LLMCostOptimizer(max_escalations=1, verbose=True)
     query_count = 0
     
     while True:
@@ -142,7 +124,7 @@ def main():
         print("="*80)
         print("PROCESSING THROUGH OPTIMIZER")
         print("="*80)
-        result = optimizer.process_question(user_input, verbose=True)
+        result = optimizer.process_question(user_input)
         
         # Show summary of this query
         print("\n" + "="*80)
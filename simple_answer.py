@@ -24,7 +24,7 @@ def main():
             continue
         
         print("\n⏳ Getting answer...")
-        result = optimizer.process_question(question, verbose=False)
+        result = optimizer.process_question(question)
         
         print("\n" + "="*80)
         print("ANSWER:")
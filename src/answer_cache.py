@@ -0,0 +1,252 @@
+"""
+Answer Cache: Stores good answers on disk so repeated questions skip the LLM.
+
+WHY THIS EXISTS:
+- The same question is often asked again (demo re-runs, interactive sessions)
+- A cache hit is a ~1ms disk read instead of a 500-2000ms paid LLM call
+- Keys are content hashes, so no index file has to be kept in sync
+- Entries remember the config of the routed and the answering model, so
+  changing pricing or thresholds in the router invalidates stale answers
+- Answers that failed validation are kept too (as "attempts"), so the next
+  run can skip the model that already failed on that question
+- ResponseCache sits one level lower: it stores raw API responses per exact
+  request, so identical API calls aren't paid for twice (opt-in during
+  development, see validator.response_cache)
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from datetime import datetime
+from typing import Optional
+
+from src.router import get_model_config
+
+
+def schema_version(model_name: str) -> str:
+    """Short fingerprint of the model's configuration."""
+    config = json.dumps(dict(get_model_config(model_name)), sort_keys=True)
+    return hashlib.sha256(config.encode("utf-8")).hexdigest()[:12]
+
+
+def _entry_schema(model_name: str, final_model: str) -> str:
+    """
+    Fingerprint of every model an entry depends on.
+
+    An escalated answer came from the final model, so a config change to
+    either the routed or the final model makes it stale.
+    """
+    if final_model == model_name:
+        return schema_version(model_name)
+    return f"{schema_version(model_name)}:{schema_version(final_model)}"
+
+
+def _shard_path(cache_dir: str, key: str) -> str:
+    """<cache_dir>/<first 2 hex chars>/<key>.json"""
+    return os.path.join(cache_dir, key[:2], f"{key}.json")
+
+
+def _read_json(path: str) -> Optional[dict]:
+    """Load a JSON entry, or None if it is missing or corrupt."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_json(path: str, entry: dict) -> None:
+    """
+    Write a JSON entry to disk.
+
+    WHY ATOMIC WRITE:
+    - The entry is written to a temp file and then renamed into place
+    - Readers never see a half-written file, even if we crash mid-write
+    """
+    directory = os.path.dirname(path)
+
+    try:
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"✗ Error writing cache entry: {e}")
+
+
+class AnswerCache:
+    """
+    Filesystem cache of answers keyed by (model, question).
+
+    Layout: <cache_dir>/<first 2 hex chars>/<sha256>.json
+    Sharding by prefix keeps any single directory small.
+    Failed attempts use the same layout under <cache_dir>/attempts/.
+    """
+
+    def __init__(self, cache_dir: str = "output/answer_cache"):
+        """
+        Initialize the cache.
+
+        Args:
+            cache_dir: Directory where cache entries are stored
+        """
+        self.cache_dir = cache_dir
+
+    def _path(self, question: str, model_name: str, kind: str = "") -> str:
+        """Location of the cache entry for this question and model."""
+        key = hashlib.sha256(f"{model_name}:{question}".encode("utf-8")).hexdigest()
+        return _shard_path(os.path.join(self.cache_dir, kind), key)
+
+    def _read(self, path: str, model_name: str) -> Optional[dict]:
+        """Load an entry, or None if it is missing, corrupt or stale."""
+        entry = _read_json(path)
+        if entry is None:
+            return None
+        if entry.get("schema") != _entry_schema(model_name, entry.get("final_model", model_name)):
+            return None
+        return entry
+
+    def get(self, question: str, model_name: str) -> Optional[dict]:
+        """
+        Look up a cached answer.
+
+        Args:
+            question: The user's question
+            model_name: Model the question was routed to
+
+        Returns:
+            Cached entry (answer, quality_score, final_model, cached_at),
+            or None on a miss or if the entry is stale/corrupt
+        """
+
+        return self._read(self._path(question, model_name), model_name)
+
+    def put(self, question: str, model_name: str, result: dict) -> None:
+        """
+        Store an answer.
+
+        Args:
+            question: The user's question
+            model_name: Model the question was routed to
+            result: Result dictionary from the optimizer
+        """
+
+        entry = {
+            "schema": _entry_schema(model_name, result["final_model"]),
+            "answer": result["answer"],
+            "quality_score": result["quality_score"],
+            "final_model": result["final_model"],
+            "cached_at": datetime.now().isoformat()
+        }
+
+        _write_json(self._path(question, model_name), entry)
+
+    def put_attempt(self, question: str, model_name: str, answer: str, quality_score: float, escalated: bool) -> None:
+        """
+        Store a model's answer whatever its quality.
+
+        WHY: If the small model failed on a question, asking it again next
+        run would most likely fail again. Remembering the attempt lets the
+        optimizer go straight to the large model (and refine this answer).
+
+        Args:
+            question: The user's question
+            model_name: Model that produced the answer
+            answer: The generated answer
+            quality_score: Its validation score
+            escalated: Whether it failed validation
+        """
+
+        entry = {
+            "schema": schema_version(model_name),
+            "answer": answer,
+            "quality_score": quality_score,
+            "escalated": escalated,
+            "cached_at": datetime.now().isoformat()
+        }
+
+        _write_json(self._path(question, model_name, "attempts"), entry)
+
+    def get_attempt(self, question: str, model_name: str, max_age_secs: float = 86400) -> Optional[dict]:
+        """
+        Look up a stored attempt (see put_attempt()).
+
+        Args:
+            question: The user's question
+            model_name: Model that produced the answer
+            max_age_secs: Ignore attempts older than this, so a question
+                gets another try on the cheap model now and then
+
+        Returns:
+            Attempt entry (answer, quality_score, escalated, cached_at),
+            or None on a miss or if the entry is stale/corrupt/expired
+        """
+
+        entry = self._read(self._path(question, model_name, "attempts"), model_name)
+        if entry is None:
+            return None
+
+        try:
+            age = (datetime.now() - datetime.fromisoformat(entry["cached_at"])).total_seconds()
+        except (KeyError, ValueError):
+            return None
+
+        return entry if age <= max_age_secs else None
+
+
+class ResponseCache:
+    """
+    Filesystem cache of raw API responses keyed by the exact request.
+
+    The key covers model ID, prompt, temperature and max_tokens, so any
+    change to the request is a miss. Same sharded layout as AnswerCache.
+    """
+
+    def __init__(self, cache_dir: str = ".groq_cache", ttl_secs: float = 86400):
+        """
+        Initialize the cache.
+
+        Args:
+            cache_dir: Directory where responses are stored
+            ttl_secs: Responses older than this are fetched again
+        """
+        self.cache_dir = cache_dir
+        self.ttl_secs = ttl_secs
+
+    def _path(self, request: dict) -> str:
+        """Location of the entry for this chat completion request."""
+        prompt = "\n".join(message["content"] for message in request["messages"])
+        raw = f"{request['model']}|{prompt}|{request['temperature']}|{request['max_tokens']}"
+        return _shard_path(self.cache_dir, hashlib.sha256(raw.encode("utf-8")).hexdigest())
+
+    def get(self, request: dict) -> Optional[str]:
+        """
+        Look up the stored response for a request.
+
+        Returns:
+            The answer text, or None on a miss or if the entry has expired
+        """
+
+        entry = _read_json(self._path(request))
+        if entry is None:
+            return None
+
+        try:
+            age = (datetime.now() - datetime.fromisoformat(entry["cached_at"])).total_seconds()
+        except (KeyError, ValueError):
+            return None
+
+        return entry.get("answer") if age <= self.ttl_secs else None
+
+    def put(self, request: dict, answer: str) -> None:
+        """
+        Store a successful response (never call this with an error message).
+
+        Args:
+            request: The chat completion request that was sent
+            answer: The answer text the API returned
+        """
+
+        _write_json(self._path(request), {"answer": answer, "cached_at": datetime.now().isoformat()})
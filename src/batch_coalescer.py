@@ -0,0 +1,200 @@
+"""
+Batch Coalescer: Merges questions that arrive close together into fewer LLM calls.
+
+WHY THIS EXISTS:
+- With many questions in flight (aprocess_many, several users), the same
+  or nearly the same question is often asked at the same moment
+- Short questions routed to the small model can share one combined prompt
+- Fewer calls means less per-call overhead and fewer requests counted
+  against the provider's rate limit
+
+HOW IT WORKS:
+- generate() parks each question for a short time window (default 200ms)
+- When the window closes, pending questions are grouped by model
+- Near-duplicates (same word and word-pair similarity as the semantic cache)
+  share one answer
+- Short small-model questions are sent together, up to `max_batch` per
+  call, and the reply is split back apart on "### ANSWER <n>" marker lines
+  (numbers like "1." would clash with numbered lists inside the answers)
+- Long or large-model questions get a call of their own: their answers are
+  long, so sharing a call saves little and a failed split costs a lot
+- If a reply can't be split, those questions are asked one by one
+
+TRADE-OFF:
+- Every question waits up to `time_window_ms` before its call starts
+- Only worth it when many questions are processed concurrently, so the
+  optimizer uses it only with LLMCostOptimizer(coalesce=True)
+"""
+
+import asyncio
+
+from src.semantic_cache import _content_words, _same_order, _vectorize
+from src.validator import generate_answer_async, generate_answers_combined_async
+
+
+def _similarity(first: dict, second: dict) -> float:
+    """Cosine similarity of two normalized bag-of-words vectors."""
+    if len(first) > len(second):
+        first, second = second, first
+    return sum(weight * second.get(word, 0.0) for word, weight in first.items())
+
+
+class BatchCoalescer:
+    """
+    Collects concurrent generate() calls and answers them in merged batches.
+
+    Counters (Prometheus-style names):
+    - batch_coalesced_total: questions answered without a call of their own
+    - batch_merge_rate: share of questions that didn't need their own call
+    """
+
+    def __init__(
+        self,
+        similarity_threshold: float = 0.9,
+        time_window_ms: float = 200,
+        max_batch: int = 8,
+        max_combined_words: int = 20
+    ):
+        """
+        Initialize the coalescer.
+
+        Args:
+            similarity_threshold: Minimum similarity (0.0-1.0) for two
+                questions to share one answer
+            time_window_ms: How long a question waits for others to join it
+            max_batch: Maximum questions sent in one combined prompt
+            max_combined_words: Longer questions are never combined
+        """
+        self.similarity_threshold = similarity_threshold
+        self.time_window = time_window_ms / 1000
+        self.max_batch = max_batch
+        self.max_combined_words = max_combined_words
+
+        self._pending = []       # (question, model_name, future)
+        self._flush_task = None  # Timer that closes the current window
+        self._calls = set()      # Merged calls in flight (keeps tasks referenced)
+
+        self.requests_total = 0
+        self.calls_total = 0
+
+    @property
+    def batch_coalesced_total(self) -> int:
+        return self.requests_total - self.calls_total
+
+    @property
+    def batch_merge_rate(self) -> float:
+        return self.batch_coalesced_total / self.requests_total if self.requests_total else 0.0
+
+    def metrics(self) -> dict:
+        """Current counter values."""
+        return {
+            "batch_requests_total": self.requests_total,
+            "batch_calls_total": self.calls_total,
+            "batch_coalesced_total": self.batch_coalesced_total,
+            "batch_merge_rate": self.batch_merge_rate
+        }
+
+    async def generate(self, question: str, model_name: str) -> str:
+        """
+        Answer a question, possibly sharing the LLM call with others.
+
+        Args:
+            question: The user's question
+            model_name: The selected model ("small" or "large")
+
+        Returns:
+            Generated answer as a string
+        """
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((question, model_name, future))
+
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_after_window())
+
+        return await future
+
+    async def _flush_after_window(self) -> None:
+        """Wait for the window to close, then send everything collected."""
+
+        await asyncio.sleep(self.time_window)
+        pending, self._pending = self._pending, []
+        self._flush_task = None
+
+        # Callers that gave up (e.g. a cancelled speculative call) need no answer
+        pending = [entry for entry in pending if not entry[2].done()]
+
+        by_model = {}
+        for question, model_name, future in pending:
+            by_model.setdefault(model_name, []).append((question, future))
+
+        # Each call resolves its own futures, so a fast small-model batch
+        # isn't held back by a slow large-model one
+        for model_name, entries in by_model.items():
+            clusters = self._cluster(entries)
+            self.requests_total += len(entries)
+
+            combinable = [cluster for cluster in clusters if self._combinable(cluster[0], model_name)]
+            chunks = [combinable[i:i + self.max_batch] for i in range(0, len(combinable), self.max_batch)]
+            chunks += [[cluster] for cluster in clusters if not self._combinable(cluster[0], model_name)]
+
+            for chunk in chunks:
+                task = asyncio.create_task(self._answer_chunk(model_name, chunk))
+                self._calls.add(task)
+                task.add_done_callback(self._calls.discard)
+
+    def _combinable(self, question: str, model_name: str) -> bool:
+        """Only short small-model questions share a combined prompt."""
+        return model_name == "small" and len(question.split()) <= self.max_combined_words
+
+    def _cluster(self, entries: list) -> list:
+        """
+        Group near-duplicate questions.
+
+        Returns:
+            List of (representative question, [futures]) pairs
+        """
+
+        clusters = []   # [question, vector, words, futures]
+        for question, future in entries:
+            vector = _vectorize(question)
+            words = _content_words(question)
+            for cluster in clusters:
+                if question == cluster[0] or (
+                    _similarity(vector, cluster[1]) >= self.similarity_threshold
+                    and _same_order(words, cluster[2])
+                ):
+                    cluster[3].append(future)
+                    break
+            else:
+                clusters.append([question, vector, words, [future]])
+
+        return [(question, futures) for question, _, _, futures in clusters]
+
+    async def _answer_chunk(self, model_name: str, chunk: list) -> None:
+        """Send one merged call (or single calls as a fallback) and resolve futures."""
+
+        questions = [question for question, _ in chunk]
+        answers = None
+
+        try:
+            if len(questions) > 1:
+                self.calls_total += 1
+                answers = await generate_answers_combined_async(questions, model_name)
+
+            if answers is None:
+                self.calls_total += len(questions)
+                answers = await asyncio.gather(*(
+                    generate_answer_async(question, model_name) for question in questions
+                ))
+        except Exception as e:
+            for _, futures in chunk:
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(e)
+            return
+
+        for (_, futures), answer in zip(chunk, answers):
+            for future in futures:
+                if not future.done():
+                    future.set_result(answer)
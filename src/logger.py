@@ -1,5 +1,5 @@
 """
-Logger: Records model usage, costs, and latency to CSV.
+Logger: Records model usage, costs, and latency to CSV (or Parquet).
 
 WHY THIS EXISTS:
 - Tracks which models are used for which questions
@@ -9,13 +9,57 @@ WHY THIS EXISTS:
 - Provides audit trail for debugging
 """
 
+import atexit
 import csv
 import os
+import random
+import threading
 import time
+import uuid
 from datetime import datetime
 
+# Optional: PyArrow reads and aggregates large logs in vectorized C code,
+# and is required for the Parquet log format
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.csv as pv
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
 
-def log_result(
+# Simulated-latency generators, one per thread (created on first use)
+# WHY: Threads never share generator state, so concurrent workers don't
+# contend on it and each one's sequence stays independent
+_RNG = threading.local()
+
+
+def _rng() -> random.Random:
+    """This thread's random generator."""
+    generator = getattr(_RNG, "generator", None)
+    if generator is None:
+        generator = _RNG.generator = random.Random()
+    return generator
+
+
+# Column order of the CSV log
+FIELDNAMES = [
+    "timestamp",
+    "question",
+    "question_length",
+    "initial_model",
+    "final_model",
+    "escalated",
+    "quality_score",
+    "latency_ms",
+    "estimated_cost_usd",
+    "answer_preview",
+    "speculative_used",
+    "refinement_used"
+]
+
+
+def _build_row(
     question: str,
     initial_model: str,
     final_model: str,
@@ -24,37 +68,12 @@ def log_result(
     escalated: bool,
     latency_ms: float,
     estimated_cost: float,
-    output_file: str = "output/optimizer_log.csv"
-) -> None:
-    """
-    Log the result of a question to CSV file.
+    speculative_used: bool = False,
+    refinement_used: bool = False
+) -> dict:
+    """Format one result as a CSV row."""
     
-    WHY CSV FORMAT:
-    - Simple, human-readable format
-    - Easy to analyze in Excel, Python, etc.
-    - No database setup required
-    - Can be imported into analytics tools
-    - Beginner-friendly
-    
-    Args:
-        question: The original question
-        initial_model: Model selected by router
-        final_model: Model actually used (may differ if escalated)
-        answer: The generated answer
-        quality_score: Calculated quality score
-        escalated: Whether escalation occurred
-        latency_ms: Total latency in milliseconds
-        estimated_cost: Estimated cost in dollars
-        output_file: Path to output CSV file
-    """
-    
-    # Ensure output directory exists
-    output_dir = os.path.dirname(output_file)
-    if output_dir and not os.path.exists(output_dir):
-        os.makedirs(output_dir, exist_ok=True)
-    
-    # Prepare row data
-    row = {
+    return {
         "timestamp": datetime.now().isoformat(),
         "question": question,
         "question_length": len(question.split()),
@@ -64,38 +83,302 @@ def log_result(
         "quality_score": f"{quality_score:.2f}",
         "latency_ms": f"{latency_ms:.0f}",
         "estimated_cost_usd": f"{estimated_cost:.6f}",
-        "answer_preview": answer[:100] + "..." if len(answer) > 100 else answer
+        "answer_preview": answer[:100] + "..." if len(answer) > 100 else answer,
+        "speculative_used": "Yes" if speculative_used else "No",
+        "refinement_used": "Yes" if refinement_used else "No"
     }
+
+
+def _upgrade_header(output_file: str) -> None:
+    """
+    Rewrite an existing CSV whose header predates the current FIELDNAMES.
     
-    # Check if file exists (to know if we need to write headers)
-    file_exists = os.path.isfile(output_file)
+    WHY: Appending rows with new columns under an old header would
+    misalign every column after the first new one. Old rows get blanks
+    for the new columns.
+    """
     
-    # Write to CSV
-    try:
-        with open(output_file, "a", newline="", encoding="utf-8") as csvfile:
-            fieldnames = row.keys()
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+    with open(output_file, "r", newline="", encoding="utf-8") as csvfile:
+        header = next(csv.reader(csvfile), [])
+    
+    if header == FIELDNAMES:
+        return
+    
+    tmp_file = output_file + ".tmp"
+    with open(output_file, "r", newline="", encoding="utf-8") as src, \
+            open(tmp_file, "w", newline="", encoding="utf-8") as dst:
+        writer = csv.DictWriter(dst, fieldnames=FIELDNAMES, restval="", extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(csv.DictReader(src))
+    os.replace(tmp_file, output_file)
+
+
+class BufferedCSVLogger:
+    """
+    Records results to a CSV file, writing them in batches.
+    
+    WHY CSV FORMAT:
+    - Simple, human-readable format
+    - Easy to analyze in Excel, Python, etc.
+    - No database setup required
+    - Can be imported into analytics tools
+    - Beginner-friendly
+    
+    WHY BUFFERED:
+    - Opening the file, checking for a header and flushing once per
+      question adds several system calls to every query
+    - Here the file is opened once, rows collect in memory, and they are
+      written every `batch_size` rows, on flush(), and at interpreter exit
+    - Trade-off: a hard crash can lose up to `batch_size - 1` rows
+    """
+    
+    def __init__(self, output_file: str = "output/optimizer_log.csv", batch_size: int = 100):
+        """
+        Open the log file (creating it with a header if needed).
+        
+        Args:
+            output_file: Path to output CSV file
+            batch_size: Number of buffered rows that triggers a write
+        """
+        
+        self.output_file = output_file
+        self.batch_size = batch_size
+        self.fieldnames = FIELDNAMES
+        self.buffer = []
+        self._file = None
+        
+        # Ensure output directory exists
+        output_dir = os.path.dirname(output_file)
+        if output_dir and not os.path.exists(output_dir):
+            os.makedirs(output_dir, exist_ok=True)
+        
+        # Check once whether the file needs a header
+        file_exists = os.path.isfile(output_file) and os.path.getsize(output_file) > 0
+        
+        try:
+            if file_exists:
+                _upgrade_header(output_file)
+            
+            self._file = open(output_file, "a", newline="", encoding="utf-8")
+            self._writer = csv.DictWriter(self._file, fieldnames=self.fieldnames)
             
             # Write header only if file is new
             if not file_exists:
-                writer.writeheader()
-            
-            # Write the data row
-            writer.writerow(row)
+                self._writer.writeheader()
+                self._file.flush()
+        
+        except IOError as e:
+            print(f"✗ Error opening {output_file}: {e}")
+        
+        atexit.register(self.close)
+    
+    def log(
+        self,
+        question: str,
+        initial_model: str,
+        final_model: str,
+        answer: str,
+        quality_score: float,
+        escalated: bool,
+        latency_ms: float,
+        estimated_cost: float,
+        speculative_used: bool = False,
+        refinement_used: bool = False
+    ) -> None:
+        """
+        Buffer the result of a question.
+        
+        Args:
+            question: The original question
+            initial_model: Model selected by router
+            final_model: Model actually used (may differ if escalated)
+            answer: The generated answer
+            quality_score: Calculated quality score
+            escalated: Whether escalation occurred
+            latency_ms: Total latency in milliseconds
+            estimated_cost: Estimated cost in dollars
+            speculative_used: Whether the large model also ran speculatively
+            refinement_used: Whether the final answer is a refined draft
+        """
+        
+        self.buffer.append(_build_row(
+            question=question,
+            initial_model=initial_model,
+            final_model=final_model,
+            answer=answer,
+            quality_score=quality_score,
+            escalated=escalated,
+            latency_ms=latency_ms,
+            estimated_cost=estimated_cost,
+            speculative_used=speculative_used,
+            refinement_used=refinement_used
+        ))
+        
+        if len(self.buffer) >= self.batch_size:
+            self.flush()
+    
+    def flush(self) -> None:
+        """Write all buffered rows to the CSV file."""
+        
+        if not self.buffer or self._file is None:
+            return
+        
+        try:
+            self._writer.writerows(self.buffer)
+            self._file.flush()
         
-        print(f"✓ Logged to {output_file}")
+        except IOError as e:
+            print(f"✗ Error writing to {self.output_file}: {e}")
+        
+        self.buffer.clear()
     
-    except IOError as e:
-        print(f"✗ Error writing to {output_file}: {e}")
+    def close(self) -> None:
+        """Flush remaining rows and close the file."""
+        
+        self.flush()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
 
 
-def calculate_cost(model_name: str, answer_length: int, model_config: dict) -> float:
+class ParquetLogger:
+    """
+    Records results to a Parquet dataset, for high-volume deployments.
+    
+    WHY PARQUET:
+    - Columnar and compressed: typically several times smaller than CSV
+    - Typed columns (floats stay floats), so stats skip text parsing
+    - Low-cardinality strings like model names are dictionary-encoded
+      by Parquet automatically
+    
+    Parquet files cannot be appended to, so `output_file` is a directory:
+    every flush writes one complete part file inside it (a file is only
+    readable once finished). Rows are buffered until `row_group_size` of
+    them are ready, so part files stay large. Readers treat the directory
+    as one table.
+    
+    Requires the optional `pyarrow` package.
+    """
+    
+    def __init__(self, output_file: str = "output/optimizer_log.parquet", row_group_size: int = 1024):
+        """
+        Prepare the dataset directory.
+        
+        Args:
+            output_file: Path to the Parquet dataset directory
+            row_group_size: Number of buffered rows written as one row group
+        """
+        
+        if pa is None:
+            raise ImportError("The Parquet log format requires pyarrow (pip install pyarrow)")
+        
+        self.output_file = output_file
+        self.batch_size = row_group_size
+        self.buffer = []
+        self._schema = pa.schema([
+            ("timestamp", pa.timestamp("us")),
+            ("question", pa.string()),
+            ("question_length", pa.int32()),
+            ("initial_model", pa.string()),
+            ("final_model", pa.string()),
+            ("escalated", pa.bool_()),
+            ("quality_score", pa.float64()),
+            ("latency_ms", pa.float64()),
+            ("estimated_cost_usd", pa.float64()),
+            ("answer_preview", pa.string()),
+            ("speculative_used", pa.bool_()),
+            ("refinement_used", pa.bool_())
+        ])
+        
+        os.makedirs(output_file, exist_ok=True)
+        atexit.register(self.close)
+    
+    def log(
+        self,
+        question: str,
+        initial_model: str,
+        final_model: str,
+        answer: str,
+        quality_score: float,
+        escalated: bool,
+        latency_ms: float,
+        estimated_cost: float,
+        speculative_used: bool = False,
+        refinement_used: bool = False
+    ) -> None:
+        """
+        Buffer the result of a question (same arguments as BufferedCSVLogger.log).
+        """
+        
+        self.buffer.append({
+            "timestamp": datetime.now(),
+            "question": question,
+            "question_length": len(question.split()),
+            "initial_model": initial_model,
+            "final_model": final_model,
+            "escalated": escalated,
+            "quality_score": quality_score,
+            "latency_ms": latency_ms,
+            "estimated_cost_usd": estimated_cost,
+            "answer_preview": answer[:100] + "..." if len(answer) > 100 else answer,
+            "speculative_used": speculative_used,
+            "refinement_used": refinement_used
+        })
+        
+        if len(self.buffer) >= self.batch_size:
+            self.flush()
+    
+    def flush(self) -> None:
+        """Write all buffered rows to a new part file."""
+        
+        if not self.buffer:
+            return
+        
+        part_name = f"part-{datetime.now():%Y%m%d%H%M%S}-{uuid.uuid4().hex[:8]}.parquet"
+        
+        try:
+            pq.write_table(
+                pa.Table.from_pylist(self.buffer, schema=self._schema),
+                os.path.join(self.output_file, part_name),
+                row_group_size=self.batch_size
+            )
+        
+        except (IOError, pa.ArrowException) as e:
+            print(f"✗ Error writing to {self.output_file}: {e}")
+        
+        self.buffer.clear()
+    
+    def close(self) -> None:
+        """Flush remaining rows."""
+        
+        self.flush()
+
+
+def create_logger(log_format: str = "csv"):
+    """
+    Create the logger for the requested format.
+    
+    Args:
+        log_format: "csv" (default, human-readable) or "parquet" (compact, typed)
+        
+    Returns:
+        BufferedCSVLogger or ParquetLogger
+    """
+    
+    if log_format == "csv":
+        return BufferedCSVLogger()
+    if log_format == "parquet":
+        return ParquetLogger()
+    raise ValueError(f"Unknown log format: {log_format!r} (expected 'csv' or 'parquet')")
+
+
+def calculate_cost(model_name: str, answer_length: int, model_config: dict, prompt_length: int = 0) -> float:
     """
     Estimate the cost of generating an answer.
     
     WHY ESTIMATE:
     - Real costs depend on token count, which requires tokenization
-    - For simplicity, we estimate based on answer length
+    - For simplicity, we estimate based on prompt and answer length
     - In production, use actual token counts from the API
     
     Formula:
@@ -106,13 +389,15 @@ def calculate_cost(model_name: str, answer_length: int, model_config: dict) -> f
         model_name: Name of the model used
         answer_length: Length of generated answer in words
         model_config: Model configuration dictionary
+        prompt_length: Length of the prompt sent in words (the question,
+            or question + draft when an answer was refined)
         
     Returns:
         Estimated cost in USD
     """
     
     # Rough token estimation: ~1.3 words per token on average
-    estimated_tokens = answer_length / 1.3
+    estimated_tokens = (prompt_length + answer_length) / 1.3
     
     # Get model cost
     cost_per_1k_tokens = model_config.get("cost_per_1k_tokens", 0.001)
@@ -123,7 +408,7 @@ def calculate_cost(model_name: str, answer_length: int, model_config: dict) -> f
     return total_cost
 
 
-def estimate_latency(model_name: str, model_config: dict) -> float:
+def estimate_latency(base_latency_ms: float) -> float:
     """
     Estimate latency for the API call.
     
@@ -133,20 +418,16 @@ def estimate_latency(model_name: str, model_config: dict) -> float:
     - Add some randomness to simulate real-world variation
     
     Args:
-        model_name: Name of the model used
-        model_config: Model configuration dictionary
+        base_latency_ms: Average latency of the model used
+            (the "avg_latency_ms" value of its config)
         
     Returns:
         Estimated latency in milliseconds
     """
     
-    import random
-    
-    base_latency = model_config.get("avg_latency_ms", 1000)
-    
     # Add ±30% randomness to simulate real variation
-    variation = random.uniform(0.7, 1.3)
-    estimated_latency = base_latency * variation
+    variation = _rng().uniform(0.7, 1.3)
+    estimated_latency = base_latency_ms * variation
     
     return estimated_latency
 
@@ -160,37 +441,38 @@ def get_summary_stats(output_file: str = "output/optimizer_log.csv") -> dict:
     - Shows cost savings from routing
     - Identifies patterns in escalations
     
+    Uses PyArrow when it is installed (much faster on large logs) and a
+    pure-Python streaming pass otherwise. Both give the same result.
+    Paths ending in ".parquet" are read as Parquet logs (needs PyArrow).
+    
     Args:
-        output_file: Path to the CSV log file
+        output_file: Path to the CSV log file or Parquet log directory
         
     Returns:
         Dictionary with summary statistics
     """
     
-    if not os.path.isfile(output_file):
+    if not os.path.exists(output_file):
         return {"status": "No log file found"}
     
+    if os.path.isfile(output_file) and os.path.getsize(output_file) == 0:
+        return {"status": "Log file is empty"}
+    
     try:
-        # Read CSV file
-        with open(output_file, "r", encoding="utf-8") as csvfile:
-            reader = csv.DictReader(csvfile)
-            rows = list(reader)
+        if output_file.endswith(".parquet"):
+            if pa is None:
+                return {"status": "Reading Parquet logs requires pyarrow"}
+            totals = _summarize_parquet(output_file)
+        elif pa is not None:
+            totals = _summarize_arrow(output_file)
+        else:
+            totals = _summarize_stream(output_file)
         
-        if not rows:
+        if totals is None:
             return {"status": "Log file is empty"}
         
-        # Calculate statistics
-        total_queries = len(rows)
-        total_cost = sum(float(row["estimated_cost_usd"]) for row in rows)
-        total_latency = sum(float(row["latency_ms"]) for row in rows)
-        escalated_count = sum(1 for row in rows if row["escalated"] == "Yes")
-        avg_quality = sum(float(row["quality_score"]) for row in rows) / total_queries
-        
-        # Count model usage
-        model_usage = {}
-        for row in rows:
-            model = row["final_model"]
-            model_usage[model] = model_usage.get(model, 0) + 1
+        total_queries, total_cost, total_latency, escalated_count, quality_sum, model_usage = totals
+        avg_quality = quality_sum / total_queries
         
         stats = {
             "status": "success",
@@ -209,3 +491,145 @@ def get_summary_stats(output_file: str = "output/optimizer_log.csv") -> dict:
     
     except Exception as e:
         return {"status": f"Error reading log: {e}"}
+
+
+def _summarize_stream(output_file: str):
+    """
+    Aggregate the log with a single streaming pass in pure Python.
+    
+    WHY: Memory stays constant however large the log grows, and each
+    row is visited once instead of once per statistic.
+    
+    Returns:
+        (total_queries, total_cost, total_latency, escalated_count,
+        quality_sum, model_usage), or None if the log has no rows
+    """
+    
+    total_queries = 0
+    total_cost = 0.0
+    total_latency = 0.0
+    escalated_count = 0
+    quality_sum = 0.0
+    model_usage = {}
+    
+    with open(output_file, "r", newline="", encoding="utf-8") as csvfile:
+        reader = csv.reader(csvfile)
+        
+        # Look up column positions once from the header
+        # (plain lists per row avoid building a dict for every row)
+        header = next(reader, None)
+        if header is None:
+            return None
+        
+        cost_idx = header.index("estimated_cost_usd")
+        latency_idx = header.index("latency_ms")
+        escalated_idx = header.index("escalated")
+        quality_idx = header.index("quality_score")
+        model_idx = header.index("final_model")
+        
+        for row in reader:
+            if not row:
+                continue
+            total_queries += 1
+            total_cost += float(row[cost_idx])
+            total_latency += float(row[latency_idx])
+            if row[escalated_idx] == "Yes":
+                escalated_count += 1
+            quality_sum += float(row[quality_idx])
+            model = row[model_idx]
+            model_usage[model] = model_usage.get(model, 0) + 1
+    
+    if total_queries == 0:
+        return None
+    
+    return total_queries, total_cost, total_latency, escalated_count, quality_sum, model_usage
+
+
+def _summarize_arrow(output_file: str):
+    """
+    Aggregate the log with PyArrow's vectorized compute kernels.
+    
+    WHY: Parsing and summing happen in C on whole columns, and only the
+    five columns we need are converted (questions and answers are skipped).
+    
+    Returns:
+        Same tuple as _summarize_stream(), or None if the log has no rows
+    """
+    
+    table = pv.read_csv(
+        output_file,
+        parse_options=pv.ParseOptions(newlines_in_values=True),
+        convert_options=pv.ConvertOptions(
+            include_columns=["final_model", "escalated", "quality_score", "latency_ms", "estimated_cost_usd"],
+            column_types={
+                "final_model": pa.string(),
+                "escalated": pa.string(),
+                "quality_score": pa.float64(),
+                "latency_ms": pa.float64(),
+                "estimated_cost_usd": pa.float64()
+            }
+        )
+    )
+    
+    return _aggregate_columns(
+        table["estimated_cost_usd"],
+        table["latency_ms"],
+        pc.equal(table["escalated"], "Yes"),
+        table["quality_score"],
+        table["final_model"]
+    )
+
+
+def _summarize_parquet(output_file: str):
+    """
+    Aggregate a Parquet log (a single file or a directory of part files).
+    
+    WHY: Columns are already typed, so nothing is parsed from text, and
+    only the five needed columns are read from disk.
+    
+    Returns:
+        Same tuple as _summarize_stream(), or None if the log has no rows
+    """
+    
+    if os.path.isdir(output_file) and not any(name.endswith(".parquet") for name in os.listdir(output_file)):
+        return None
+    
+    table = pq.read_table(
+        output_file,
+        columns=["final_model", "escalated", "quality_score", "latency_ms", "estimated_cost_usd"]
+    )
+    
+    return _aggregate_columns(
+        table["estimated_cost_usd"],
+        table["latency_ms"],
+        table["escalated"],
+        table["quality_score"],
+        table["final_model"]
+    )
+
+
+def _aggregate_columns(cost, latency, escalated, quality, final_model):
+    """
+    Sum Arrow columns into the tuple returned by the _summarize_* helpers.
+    
+    Args:
+        escalated: Boolean column (True = escalated)
+    """
+    
+    if len(cost) == 0:
+        return None
+    
+    model_counts = pc.value_counts(final_model)
+    model_usage = dict(zip(
+        model_counts.field("values").to_pylist(),
+        model_counts.field("counts").to_pylist()
+    ))
+    
+    return (
+        len(cost),
+        pc.sum(cost).as_py(),
+        pc.sum(latency).as_py(),
+        pc.sum(escalated).as_py(),
+        pc.sum(quality).as_py(),
+        model_usage
+    )
@@ -14,10 +14,134 @@ WHY THIS DESIGN:
 - No complex ML or infrastructure required
 """
 
+import asyncio
+import contextvars
+import logging
+import sys
 import time
-from src.router import estimate_difficulty, select_model, get_model_config
-from src.validator import generate_answer, calculate_quality_score, should_escalate
-from src.logger import log_result, calculate_cost, estimate_latency, get_summary_stats
+from collections import deque
+from src.router import MODEL_NAMES, analyze, get_model_config
+from src.validator import (
+    generate_answer_async, generate_answers_batch_async,
+    refine_answer_async, refine_answers_batch_async, refine_prompt, can_refine, early_stop_check,
+    calculate_quality_score, calculate_quality_scores, should_escalate, should_escalate_vec,
+    warmup
+)
+from src.logger import create_logger, calculate_cost, estimate_latency, get_summary_stats
+from src.answer_cache import AnswerCache
+from src.semantic_cache import SemanticCache
+from src.batch_coalescer import BatchCoalescer
+
+
+# Step-by-step trace of each question, shown with LLMCostOptimizer(verbose=True)
+# WHY LOGGING INSTEAD OF PRINT: %-style arguments are only formatted when
+# the message is actually emitted, so quiet runs pay almost nothing
+log = logging.getLogger(__name__)
+
+_RULE = "=" * 70
+
+# Label of the question being traced ("Q3"), set per task by aprocess_many()
+# WHY: Concurrent questions' traces interleave; the label on every line
+# shows which question each step belongs to
+_TRACE_TAG = contextvars.ContextVar("trace_tag", default="")
+
+
+class _Trace(logging.LoggerAdapter):
+    """
+    Step-by-step trace of one optimizer instance.
+    
+    WHY NOT log.setLevel() OR logging.basicConfig():
+    - The level belongs to the module logger that every optimizer shares,
+      so building a quiet optimizer would silence a verbose one
+    - basicConfig() sets up the application's root logger, which a
+      library object has no business touching
+    
+    A verbose instance prints its trace to stdout through its own handler
+    (alongside the scripts' own output). Otherwise the records go to the
+    module logger and the application's logging configuration applies.
+    
+    Inside aprocess_many() every line starts with the question's label.
+    """
+    
+    def __init__(self, logger: logging.Logger, verbose: bool):
+        super().__init__(logger, {})
+        self.verbose = verbose
+        self.console = None
+        if verbose:
+            self.console = logging.StreamHandler(sys.stdout)
+            self.console.setFormatter(logging.Formatter("%(message)s"))
+    
+    def isEnabledFor(self, level: int) -> bool:
+        return self.verbose or self.logger.isEnabledFor(level)
+    
+    def log(self, level: int, msg: str, *args, **kwargs) -> None:
+        if not self.isEnabledFor(level):
+            return
+        tag = _TRACE_TAG.get()
+        if tag:
+            msg = "\n".join(f"[{tag}] {line}" if line else line for line in (msg % args).split("\n"))
+            args = ()
+        record = self.logger.makeRecord(self.logger.name, level, "(unknown file)", 0, msg, args, None)
+        if self.console is not None:
+            self.console.handle(record)
+        else:
+            self.logger.handle(record)
+
+
+# Small-routed questions at least this difficult also start the large model
+# in parallel (see aprocess_question). The router sends everything >= 0.5
+# to the large model, so the borderline band is [0.4, 0.5).
+SPECULATIVE_MIN_DIFFICULTY = 0.4
+
+# Questions harder than this never reuse a paraphrased answer
+# WHY: Small wording changes matter more in complex questions
+SEMANTIC_CACHE_MAX_DIFFICULTY = 0.8
+
+
+async def _gather(*coroutines) -> list:
+    """asyncio.gather() wrapped in a coroutine, so _run() can drive it."""
+    return await asyncio.gather(*coroutines)
+
+
+def _dedupe(questions: list) -> tuple:
+    """
+    Collapse repeated questions.
+    
+    Returns:
+        (unique questions in first-seen order, index into that list for
+        each input question)
+    """
+    unique = {}
+    order = [unique.setdefault(question, len(unique)) for question in questions]
+    return list(unique), order
+
+
+class _RateLimiter:
+    """
+    Allow at most `max_calls` entries per `period` seconds (sliding window).
+    
+    WHY: Provider APIs enforce requests-per-minute limits; waiting here is
+    cheaper than getting throttled errors back from the API.
+    """
+    
+    def __init__(self, max_calls: int, period: float = 60.0):
+        self.max_calls = max_calls
+        self.period = period
+        self._calls = deque()
+    
+    async def __aenter__(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            now = loop.time()
+            while self._calls and now - self._calls[0] >= self.period:
+                self._calls.popleft()
+            if len(self._calls) < self.max_calls:
+                self._calls.append(now)
+                return self
+            await asyncio.sleep(self.period - (now - self._calls[0]))
+    
+    async def __aexit__(self, *exc_info):
+        return False
 
 
 class LLMCostOptimizer:
@@ -28,17 +152,156 @@ class LLMCostOptimizer:
     still demonstrating best practices in code organization.
     """
     
-    def __init__(self, max_escalations: int = 1):
+    def __init__(
+        self,
+        max_escalations: int = 1,
+        use_cache: bool = True,
+        log_format: str = "csv",
+        use_refinement: bool = True,
+        coalesce: bool = False,
+        cache_low_quality_ttl_secs: float = 86400,
+        early_stop: bool = False,
+        verbose: bool = False
+    ):
         """
         Initialize the optimizer.
         
         Args:
             max_escalations: Maximum number of escalations per query
                 (prevents infinite loops)
+            use_cache: Reuse stored answers for questions seen before
+                (exact matches and close paraphrases)
+            log_format: "csv" (default) or "parquet" for high-volume logging
+                (Parquet requires pyarrow)
+            use_refinement: On escalation, have the large model improve the
+                failed draft instead of answering from scratch
+            coalesce: Merge questions processed at the same time into
+                fewer LLM calls (see BatchCoalescer; adds up to 200ms wait)
+            cache_low_quality_ttl_secs: How long a failed small-model answer
+                sends the same question straight to the large model
+            early_stop: Stream answers and stop generating once the partial
+                answer already passes validation (shorter, cheaper answers).
+                Applies to new answers in process_question(s); refinements
+                and coalesced calls always run to the end
+            verbose: Log each pipeline step (difficulty, routing, quality,
+                cost) to the console
         """
+        # Trace goes to the console only when asked for (see _Trace)
+        self._log = _Trace(log, verbose)
+        
         self.max_escalations = max_escalations
+        self.use_refinement = use_refinement
+        self.cache = AnswerCache() if use_cache else None
+        self.semantic_cache = SemanticCache() if use_cache else None
+        self.coalescer = BatchCoalescer() if coalesce else None
+        self.cache_low_quality_ttl_secs = cache_low_quality_ttl_secs
+        self.early_stop = early_stop
+        
+        # Average latency per model, looked up once instead of per question
+        self._latency_by_model = {
+            name: float(get_model_config(name).get("avg_latency_ms", 1000))
+            for name in MODEL_NAMES
+        }
+        
+        # One logger for the optimizer's lifetime (rows are written in batches)
+        self.logger = create_logger(log_format)
+        
+        # Event loop reused by the sync wrappers, so the async Groq client
+        # keeps its connections open between calls
+        self._loop = None
+        
+        # Create the async Groq client now, so the first question isn't the slow one
+        warmup()
+    
+    def _run(self, coroutine):
+        """Run a coroutine to completion on this optimizer's event loop."""
+        if self._loop is None:
+            self._loop = asyncio.new_event_loop()
+        return self._loop.run_until_complete(coroutine)
     
-    def process_question(self, question: str, verbose: bool = True) -> dict:
+    def process_question(self, question: str) -> dict:
+        """
+        Process a question through the complete optimization pipeline.
+        
+        Synchronous wrapper around aprocess_question(), kept for scripts
+        that handle one question at a time.
+        
+        Args:
+            question: User's question as string
+            
+        Returns:
+            Dictionary with results (answer, quality, cost, etc.)
+        """
+        return self._run(self.aprocess_question(question))
+    
+    async def aprocess_many(
+        self,
+        questions: list,
+        max_concurrency: int = 10,
+        rpm: int = 100
+    ) -> list:
+        """
+        Process many questions concurrently.
+        
+        Repeated questions in the list are answered only once.
+        
+        WHY CONCURRENT:
+        - Each question spends most of its time waiting on the LLM API
+        - Overlapping those waits makes total time close to the slowest
+          question instead of the sum of all questions
+        - The semaphore caps requests in flight; the rate limiter keeps
+          us under the provider's requests-per-minute limit
+        
+        Args:
+            questions: List of user questions
+            max_concurrency: Maximum questions processed at the same time
+            rpm: Maximum questions started per minute
+            
+        Returns:
+            List of result dictionaries, in the same order as `questions`
+        """
+        
+        # Repeated questions are answered once and copied back
+        # WHY: With each question repeated D times, LLM calls drop by 1 - 1/D
+        unique, order = _dedupe(questions)
+        
+        # Trace labels use input positions (Q1, Q2, ...), like the results;
+        # a repeated question is labelled with every position it answers
+        positions = [[] for _ in unique]
+        for number, index in enumerate(order, 1):
+            positions[index].append(f"Q{number}")
+        labels = ["/".join(numbers) for numbers in positions]
+        
+        semaphore = asyncio.Semaphore(max_concurrency)
+        limiter = _RateLimiter(rpm, 60.0)
+        
+        async def run_one(label: str, question: str) -> dict:
+            # Each gathered coroutine runs in its own task (and context),
+            # so the label only applies to this question's trace
+            _TRACE_TAG.set(label)
+            async with semaphore:
+                async with limiter:
+                    return await self.aprocess_question(question)
+        
+        results = await asyncio.gather(*(run_one(label, question) for label, question in zip(labels, unique)))
+        return [dict(results[index]) for index in order]
+    
+    def _early_stop_threshold(self, model_name: str):
+        """Quality threshold to stop streaming at, or None without early stopping."""
+        if not self.early_stop:
+            return None
+        return get_model_config(model_name).get("quality_threshold", 0.7)
+    
+    async def _generate(self, question: str, model_name: str) -> str:
+        """Generate an answer, through the coalescer or with early stopping when enabled."""
+        if self.coalescer is not None:
+            return await self.coalescer.generate(question, model_name)
+        threshold = self._early_stop_threshold(model_name)
+        if threshold is not None:
+            return await generate_answer_async(question, model_name, early_stop_check(question, threshold))
+        return await generate_answer_async(question, model_name)
+    
+    async def aprocess_question(self, question: str) -> dict:
         """
         Process a question through the complete optimization pipeline.
         
@@ -52,125 +315,482 @@ class LLMCostOptimizer:
         
         Args:
             question: User's question as string
-            verbose: Print debug information
             
         Returns:
             Dictionary with results (answer, quality, cost, etc.)
         """
         
-        if verbose:
-            print(f"\n{'='*70}")
-            print(f"Processing: {question[:60]}...")
-            print(f"{'='*70}")
+        self._log.debug("\n%s\nProcessing: %.60s...\n%s", _RULE, question, _RULE)
         
         # STEP 1: Estimate difficulty using heuristics
         # WHY: Cheaper models can handle simple questions, expensive models for complex ones
-        difficulty_score = estimate_difficulty(question)
-        if verbose:
-            print(f"Step 1 - Difficulty Estimation: {difficulty_score:.2f}/1.0")
+        # (one analyze() call gives the score, the routed model and its config)
+        report = analyze(question)
+        difficulty_score = report.difficulty
+        self._log.debug("Step 1 - Difficulty Estimation: %.2f/1.0", difficulty_score)
         
         # STEP 2: Route to appropriate model based on difficulty
         # WHY: Initial selection tries to use cheaper model when possible
-        initial_model = select_model(difficulty_score)
-        if verbose:
-            print(f"Step 2 - Initial Routing: {initial_model}")
+        initial_model = report.model
+        self._log.debug("Step 2 - Initial Routing: %s", initial_model)
+        
+        # Return a stored answer if this question was answered well before
+        # WHY: A disk read is far cheaper and faster than another LLM call
+        cached_result = self._cached_result(question, difficulty_score, initial_model)
+        if cached_result is not None:
+            self._log.debug("Step 3 - Cache hit, reusing answer from %s\n%s\n", cached_result["final_model"], _RULE)
+            return cached_result
         
         # Get model configuration (cost, latency, quality threshold)
-        model_config = get_model_config(initial_model)
+        model_config = report.config
         current_model = initial_model
         
         # Initialize escalation counter
         escalation_count = 0
-        escalated = False
+        
+        # The small model already failed on this question in an earlier run:
+        # reuse that answer instead of paying for it again
+        failed_attempt = self._failed_attempt(question, initial_model)
+        
+        # Speculative escalation for borderline questions
+        # WHY: These often fail validation on the small model, and waiting for
+        # small, then large, costs both latencies. Starting large right away
+        # hides that wait; if small passes, the large call is cancelled.
+        # Trade-off: some large-model spend on questions that didn't need it.
+        speculative_task = None
+        if (
+            initial_model == "small"
+            and failed_attempt is None
+            and self.max_escalations > 0
+            and difficulty_score >= SPECULATIVE_MIN_DIFFICULTY
+        ):
+            speculative_task = asyncio.create_task(self._generate(question, "large"))
+            self._log.debug("Step 3 - Borderline difficulty, starting large in parallel")
+        speculative_used = speculative_task is not None
+        
+        # Draft to refine on the next attempt (set when escalating)
+        draft = None
+        refinement_used = False
         
         # Loop for potential escalations
         while escalation_count <= self.max_escalations:
             
             # STEP 3: Generate answer using selected model
             # WHY: Create output for quality validation
-            if verbose:
-                print(f"Step 3 - Generating answer with {current_model}...")
-            
-            answer = generate_answer(question, current_model)
+            prompt = question
+            refinement_used = False
+            if failed_attempt is not None:
+                self._log.debug("Step 3 - Reusing failed %s answer from an earlier run", current_model)
+                answer = failed_attempt["answer"]
+            elif current_model == "large" and speculative_task is not None:
+                self._log.debug("Step 3 - Using speculative answer from %s...", current_model)
+                answer = await speculative_task  # Already in flight
+                speculative_task = None
+            elif draft is not None:
+                self._log.debug("Step 3 - Refining draft with %s...", current_model)
+                prompt = refine_prompt(question, draft)
+                answer = await refine_answer_async(question, draft)
+                refinement_used = True
+                draft = None
+            else:
+                self._log.debug("Step 3 - Generating answer with %s...", current_model)
+                answer = await self._generate(question, current_model)
             
             # STEP 4: Validate answer quality using basic heuristics
             # WHY: Ensure answer meets minimum quality standards before returning
-            if verbose:
-                print(f"Step 4 - Validating answer quality...")
+            self._log.debug("Step 4 - Validating answer quality...")
             
-            quality_score = calculate_quality_score(answer, question)
+            if failed_attempt is not None:
+                quality_score = failed_attempt["quality_score"]
+                failed_attempt = None
+            else:
+                quality_score = calculate_quality_score(answer, question)
+                if current_model == "small" and self.cache is not None:
+                    self._remember_attempt(question, answer, quality_score)
             quality_threshold = model_config.get("quality_threshold", 0.7)
             
-            if verbose:
-                print(f"         Quality Score: {quality_score:.2f}/1.0 (threshold: {quality_threshold:.2f})")
+            self._log.debug("         Quality Score: %.2f/1.0 (threshold: %.2f)", quality_score, quality_threshold)
             
             # STEP 5: Check if escalation is needed
             # WHY: If quality is below threshold, use better (more expensive) model
             if should_escalate(quality_score, quality_threshold):
                 if escalation_count < self.max_escalations:
                     escalation_count += 1
-                    escalated = True
                     current_model = "large"  # Escalate to large model
                     model_config = get_model_config(current_model)
                     
-                    if verbose:
-                        print(f"Step 5 - Escalating to {current_model} (attempt {escalation_count})...")
+                    # Improve this answer rather than starting over
+                    # (unless the large model's answer is already on its way)
+                    if self.use_refinement and speculative_task is None and can_refine(answer):
+                        draft = answer
+                    
+                    self._log.debug("Step 5 - Escalating to %s (attempt %d)...", current_model, escalation_count)
                     
                     continue  # Retry with better model
                 else:
-                    if verbose:
-                        print(f"Step 5 - Escalation limit reached, using current answer")
+                    self._log.debug("Step 5 - Escalation limit reached, using current answer")
                     break
             else:
                 # Quality is acceptable
-                if verbose:
-                    print(f"Step 5 - Quality acceptable, no escalation needed")
+                self._log.debug("Step 5 - Quality acceptable, no escalation needed")
                 break
         
+        # Small answer was good enough: drop the speculative large call
+        # WHY COUNT IT: the discarded call was still (at least partly) billed
+        speculative_cost = 0.0
+        if speculative_task is not None:
+            speculative_task.cancel()
+            outcome = (await asyncio.gather(speculative_task, return_exceptions=True))[0]
+            if isinstance(outcome, str):
+                discarded_words = len(outcome.split())
+            else:
+                # Cut off mid-answer: estimate it as long as the small answer
+                discarded_words = len(answer.split())
+            speculative_cost = calculate_cost(
+                "large", discarded_words, get_model_config("large"), report.question_length
+            )
+        
         # STEP 6: Calculate costs and latency, then log to CSV
         # WHY: Track spending and performance for analysis
-        estimated_tokens = len(answer.split()) / 1.3
-        estimated_cost = calculate_cost(current_model, len(answer.split()), model_config)
-        estimated_latency = estimate_latency(current_model, model_config)
+        result = self._finalize(
+            question=question,
+            difficulty_score=difficulty_score,
+            initial_model=initial_model,
+            final_model=current_model,
+            answer=answer,
+            quality_score=quality_score,
+            escalation_count=escalation_count,
+            prompt_length=len(prompt.split()) if refinement_used else report.question_length,
+            speculative_used=speculative_used,
+            speculative_cost=speculative_cost,
+            refinement_used=refinement_used
+        )
+        self._remember(question, initial_model, result)
         
-        if verbose:
-            print(f"Step 6 - Logging results...")
-            print(f"         Estimated Cost: ${estimated_cost:.6f}")
-            print(f"         Estimated Latency: {estimated_latency:.0f}ms")
-            print(f"         Model Used: {current_model}")
+        self._log.debug("%s\n", _RULE)
+        
+        return result
+    
+    def process_questions(self, questions: list) -> list:
+        """
+        Process many questions at once, batching LLM calls by routed model.
+        
+        Repeated questions in the list are answered only once.
+        
+        WHY BATCH:
+        - process_question() waits for each LLM call before starting the next
+        - Questions routed to the same model are independent, so their calls
+          can be sent together as one batch
+        - Wall time drops from the sum of all calls to roughly one call
+          per batch (one small batch, one large batch, one escalation batch)
+        
+        STEP-BY-STEP PROCESS:
+        1. Estimate difficulty and route every question
+        2. Group question indices by routed model
+        3. Reuse cached answers; generate the rest with one concurrent batch per model
+        4. Validate every answer
+        5. Refine (or re-generate) low-quality answers as one batch on the large model
+        6. Log each question to CSV
+        
+        Args:
+            questions: List of user questions
+            
+        Returns:
+            List of result dictionaries, in the same order as `questions`
+            (same format as process_question)
+        """
+        
+        # Repeated questions are answered (and logged) once, then copied back
+        unique, order = _dedupe(questions)
+        if len(unique) < len(questions):
+            results = self.process_questions(unique)
+            return [dict(results[index]) for index in order]
+        
+        # STEP 1: Estimate difficulty and route every question
+        reports = [analyze(question) for question in questions]
+        difficulty_scores = [report.difficulty for report in reports]
+        initial_models = [report.model for report in reports]
+        current_models = list(initial_models)
+        
+        # Questions answered well before skip the LLM entirely
+        cached_results = {}
+        for index, question in enumerate(questions):
+            cached_result = self._cached_result(question, difficulty_scores[index], initial_models[index])
+            if cached_result is not None:
+                cached_results[index] = cached_result
+        
+        if cached_results:
+            self._log.debug("Batch - %d cache hit(s), skipping LLM calls", len(cached_results))
+        
+        # Small-model answers that already failed in an earlier run are
+        # reused rather than generated again (they escalate below)
+        answers = [""] * len(questions)
+        quality_scores = [0.0] * len(questions)
+        reused_attempts = set()
+        for index, question in enumerate(questions):
+            if index in cached_results:
+                continue
+            failed = self._failed_attempt(question, initial_models[index])
+            if failed is not None:
+                answers[index] = failed["answer"]
+                quality_scores[index] = failed["quality_score"]
+                reused_attempts.add(index)
+        
+        # STEP 2: Group the remaining question indices by routed model
+        buckets = {}
+        for index, model in enumerate(initial_models):
+            if index not in cached_results and index not in reused_attempts:
+                buckets.setdefault(model, []).append(index)
+        
+        # STEP 3: One batch per model, with both models' batches in flight together
+        for model, indices in buckets.items():
+            self._log.debug("Batch - Generating %d answer(s) with %s...", len(indices), model)
+        batches = self._run(_gather(*(
+            generate_answers_batch_async(
+                [questions[i] for i in indices], model,
+                early_stop_threshold=self._early_stop_threshold(model)
+            )
+            for model, indices in buckets.items()
+        )))
+        for indices, batch in zip(buckets.values(), batches):
+            for index, answer in zip(indices, batch):
+                answers[index] = answer
+        
+        # STEP 4 & 5: Validate, then escalate all low-quality answers together
+        escalation_counts = [0] * len(questions)
+        prompts = list(questions)
+        refinement_flags = [False] * len(questions)
+        pending = [index for index in range(len(questions)) if index not in cached_results]
+        
+        for attempt in range(self.max_escalations + 1):
+            # Answers reused from an earlier run were scored back then
+            to_score = [i for i in pending if attempt > 0 or i not in reused_attempts]
+            scores = calculate_quality_scores([answers[i] for i in to_score], [questions[i] for i in to_score])
+            for index, score in zip(to_score, scores):
+                quality_scores[index] = float(score)
+                if current_models[index] == "small" and self.cache is not None:
+                    self._remember_attempt(questions[index], answers[index], quality_scores[index])
+            
+            if attempt == self.max_escalations:
+                break
+            
+            escalate = should_escalate_vec(
+                [quality_scores[i] for i in pending],
+                [get_model_config(current_models[i]).get("quality_threshold", 0.7) for i in pending]
+            )
+            pending = [index for index, flag in zip(pending, escalate) if flag]
+            if not pending:
+                break
+            
+            self._log.debug("Batch - Escalating %d answer(s) to large (attempt %d)...", len(pending), attempt + 1)
+            
+            to_refine = [i for i in pending if self.use_refinement and can_refine(answers[i])]
+            to_regenerate = [i for i in pending if i not in to_refine]
+            
+            refined, regenerated = self._run(_gather(
+                refine_answers_batch_async([questions[i] for i in to_refine], [answers[i] for i in to_refine]),
+                generate_answers_batch_async(
+                    [questions[i] for i in to_regenerate], "large",
+                    early_stop_threshold=self._early_stop_threshold("large")
+                )
+            ))
+            for index, answer in zip(to_refine, refined):
+                prompts[index] = refine_prompt(questions[index], answers[index])
+                answers[index] = answer
+                refinement_flags[index] = True
+            
+            for index, answer in zip(to_regenerate, regenerated):
+                prompts[index] = questions[index]
+                answers[index] = answer
+                refinement_flags[index] = False
+            
+            for index in pending:
+                current_models[index] = "large"
+                escalation_counts[index] += 1
+        
+        # STEP 6: Log each question, preserving input order
+        results = []
+        for i in range(len(questions)):
+            if i in cached_results:
+                results.append(cached_results[i])
+                continue
+            
+            result = self._finalize(
+                question=questions[i],
+                difficulty_score=difficulty_scores[i],
+                initial_model=initial_models[i],
+                final_model=current_models[i],
+                answer=answers[i],
+                quality_score=quality_scores[i],
+                escalation_count=escalation_counts[i],
+                prompt_length=len(prompts[i].split()) if refinement_flags[i] else reports[i].question_length,
+                refinement_used=refinement_flags[i]
+            )
+            self._remember(questions[i], initial_models[i], result)
+            results.append(result)
+        
+        return results
+    
+    def _cached_result(self, question: str, difficulty_score: float, initial_model: str):
+        """
+        Build a logged result from the answer cache, or return None on a miss.
+        
+        Exact matches are tried first; simple questions may also reuse the
+        answer of a close paraphrase from the semantic cache.
+        
+        WHY: A cache hit costs no tokens, so it is logged with zero cost and
+        the measured lookup time as latency.
+        """
+        
+        if self.cache is None:
+            return None
+        
+        start = time.perf_counter()
+        entry = self.cache.get(question, initial_model)
+        if entry is None and difficulty_score <= SEMANTIC_CACHE_MAX_DIFFICULTY:
+            entry = self.semantic_cache.lookup(question)
+        if entry is None:
+            return None
+        lookup_ms = (time.perf_counter() - start) * 1000
+        
+        return self._finalize(
+            question=question,
+            difficulty_score=difficulty_score,
+            initial_model=initial_model,
+            final_model=entry["final_model"],
+            answer=entry["answer"],
+            quality_score=entry["quality_score"],
+            escalation_count=0,
+            cache_latency_ms=lookup_ms
+        )
+    
+    def _failed_attempt(self, question: str, initial_model: str):
+        """
+        Small-model answer that failed validation in an earlier run, or None.
+        
+        WHY: The same question would most likely fail on the small model
+        again, so its first call can be skipped (see AnswerCache.put_attempt).
+        """
+        
+        if self.cache is None or initial_model != "small" or self.max_escalations == 0:
+            return None
+        
+        attempt = self.cache.get_attempt(question, "small", self.cache_low_quality_ttl_secs)
+        if attempt is None or not attempt["escalated"]:
+            return None
+        return attempt
+    
+    def _remember_attempt(self, question: str, answer: str, quality_score: float) -> None:
+        """Store a small-model answer if it failed validation."""
+        
+        threshold = get_model_config("small").get("quality_threshold", 0.7)
+        
+        # API errors say nothing about the model, so they aren't remembered
+        if should_escalate(quality_score, threshold) and can_refine(answer):
+            self.cache.put_attempt(question, "small", answer, quality_score, escalated=True)
+    
+    def _remember(self, question: str, initial_model: str, result: dict) -> None:
+        """
+        Store a result in the answer cache if it passed validation.
+        
+        WHY: Low-quality answers are not cached, so the next run calls the
+        model again and gets another chance to produce a good one. (With
+        validator.response_cache enabled, an identical request replays the
+        same answer until the entry expires.)
+        """
+        
+        if self.cache is None or result["cache_hit"]:
+            return
+        
+        threshold = get_model_config(result["final_model"]).get("quality_threshold", 0.7)
+        if not should_escalate(result["quality_score"], threshold):
+            self.cache.put(question, initial_model, result)
+            self.semantic_cache.add(question, result)
+    
+    def _finalize(
+        self,
+        question: str,
+        difficulty_score: float,
+        initial_model: str,
+        final_model: str,
+        answer: str,
+        quality_score: float,
+        escalation_count: int,
+        cache_latency_ms: float = None,
+        prompt_length: int = 0,
+        speculative_used: bool = False,
+        speculative_cost: float = 0.0,
+        refinement_used: bool = False
+    ) -> dict:
+        """
+        Estimate cost and latency, log to CSV, and build the result dictionary.
+        
+        WHY A HELPER:
+        - process_question() and process_questions() must log identically
+        
+        Args:
+            cache_latency_ms: Set when the answer came from the cache; the
+                query then costs nothing and took this long
+            prompt_length: Words in the prompt of the final call (billed
+                as input tokens)
+            speculative_used: The large model was also called in parallel
+                (logged so spend on discarded calls is visible)
+            speculative_cost: Cost of a discarded speculative call, added
+                to the estimated cost
+            refinement_used: The answer is a large-model refinement of a draft
+        """
+        
+        model_config = get_model_config(final_model)
+        escalated = escalation_count > 0
+        cache_hit = cache_latency_ms is not None
+        if cache_hit:
+            estimated_cost = 0.0
+            estimated_latency = cache_latency_ms
+        else:
+            estimated_cost = calculate_cost(final_model, len(answer.split()), model_config, prompt_length)
+            estimated_cost += speculative_cost
+            estimated_latency = estimate_latency(
+                self._latency_by_model.get(final_model, self._latency_by_model["small"])
+            )
+        
+        if not cache_hit:
+            self._log.debug("Step 6 - Logging results...")
+            self._log.debug("         Estimated Cost: $%.6f", estimated_cost)
+            self._log.debug("         Estimated Latency: %.0fms", estimated_latency)
+            self._log.debug("         Model Used: %s", final_model)
             if escalated:
-                print(f"         Escalated from {initial_model} to {current_model}")
+                self._log.debug("         Escalated from %s to %s", initial_model, final_model)
         
         # Log to CSV
-        log_result(
+        self.logger.log(
             question=question,
             initial_model=initial_model,
-            final_model=current_model,
+            final_model=final_model,
             answer=answer,
             quality_score=quality_score,
             escalated=escalated,
             latency_ms=estimated_latency,
-            estimated_cost=estimated_cost
+            estimated_cost=estimated_cost,
+            speculative_used=speculative_used,
+            refinement_used=refinement_used
         )
         
         # Return complete result
-        result = {
+        return {
             "question": question,
             "answer": answer,
             "difficulty": difficulty_score,
             "initial_model": initial_model,
-            "final_model": current_model,
+            "final_model": final_model,
             "escalated": escalated,
             "escalations": escalation_count,
             "quality_score": quality_score,
             "estimated_cost": estimated_cost,
-            "estimated_latency": estimated_latency
+            "estimated_latency": estimated_latency,
+            "cache_hit": cache_hit,
+            "speculative_used": speculative_used,
+            "refinement_used": refinement_used
         }
-        
-        if verbose:
-            print(f"{'='*70}\n")
-        
-        return result
     
     def get_stats(self):
         """
@@ -178,4 +798,9 @@ class LLMCostOptimizer:
         
         WHY: Understand optimizer performance and cost savings
         """
-        return get_summary_stats()
+        # Write buffered rows first so the stats include this session
+        self.logger.flush()
+        stats = get_summary_stats(self.logger.output_file)
+        if self.coalescer is not None and isinstance(stats, dict):
+            stats.update(self.coalescer.metrics())
+        return stats
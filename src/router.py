@@ -7,65 +7,173 @@ WHY THIS EXISTS:
 - Uses simple heuristics to avoid overhead of complex ML models
 """
 
+import functools
+import re
+from dataclasses import dataclass
+from types import MappingProxyType
 
-def estimate_difficulty(question: str) -> float:
+
+# Complex questions often use words like "explain", "how", "why", "analyze"
+# A frozenset gives O(1) membership tests and is built once at import
+_COMPLEX_KEYWORDS = frozenset({
+    "explain", "how", "why", "analyze", "compare", "contrast",
+    "evaluate", "summarize", "discuss", "implement", "design",
+    "algorithm", "complex", "optimization", "technical"
+})
+
+# Splits a lowercased question into words in a single scan, dropping
+# punctuation so "how?" and "explain," still match their keywords
+_WORD_RE = re.compile(r"[a-z]+")
+
+# Punctuation that signals multiple questions or parts, counted in one scan
+_PUNCTUATION_RE = re.compile(r"[?,;]")
+
+# Model configurations (estimated values for demonstration)
+# In production, these would come from actual provider APIs
+# Read-only views, so the shared config can be returned (and cached) safely
+_MODELS = MappingProxyType({
+    "small": MappingProxyType({
+        "name": "GPT-3.5-mini",
+        "cost_per_1k_tokens": 0.0005,  # $0.0005 per 1k tokens
+        "avg_latency_ms": 500,         # ~500ms average
+        "max_tokens": 2048,
+        "quality_threshold": 0.7       # Minimum quality score before escalation
+    }),
+    "large": MappingProxyType({
+        "name": "GPT-4",
+        "cost_per_1k_tokens": 0.015,   # $0.015 per 1k tokens
+        "avg_latency_ms": 2000,        # ~2000ms average
+        "max_tokens": 4096,
+        "quality_threshold": 0.95      # Higher quality expected
+    })
+})
+
+# Names of all configured models
+MODEL_NAMES = tuple(_MODELS)
+
+
+@dataclass(frozen=True, slots=True)
+class DifficultyReport:
     """
-    Estimate question difficulty using simple heuristics.
+    Everything the router works out about a question.
+    
+    WHY ONE REPORT:
+    - The optimizer needs the score, model and config
+    - Interactive mode also shows how each heuristic contributed
+    - Computing it all in one scan means no caller has to re-derive it
+    """
+    
+    difficulty: float          # Final score, 0.0-1.0
+    question_length: int       # Number of words
+    length_score: float        # Heuristic 1 contribution
+    found_keywords: tuple      # Complex keywords present, in question order
+    keyword_score: float       # Heuristic 2 contribution
+    question_marks: int
+    commas: int
+    has_semicolon: bool
+    punct_score: float         # Heuristic 3 contribution
+    model: str                 # Routed model ("small" or "large")
+    config: MappingProxyType   # Configuration of the routed model
+
+
+@functools.lru_cache(maxsize=4096)
+def analyze(question: str) -> DifficultyReport:
+    """
+    Estimate question difficulty using simple heuristics and route it.
     
     Heuristics used:
     1. Question length: Longer = more complex
     2. Keyword indicators: "how", "why", "explain" = higher difficulty
     3. Question type: Multiple parts, technical terms = higher difficulty
     
+    Results are memoized, so a question analyzed twice (e.g. interactive
+    mode, repeat runs) is only scored once.
+    
     Args:
         question: The user's question as a string
         
     Returns:
-        Difficulty score from 0.0 (trivial) to 1.0 (very complex)
+        DifficultyReport with the score, its breakdown, and the routed model
     """
     
-    # Initialize difficulty score
-    difficulty = 0.0
-    
     # Heuristic 1: Length indicator
     # Longer questions often indicate more complex topics
     question_length = len(question.split())
     if question_length < 5:
-        difficulty += 0.1  # Very short, likely simple
+        length_score = 0.1  # Very short, likely simple
     elif question_length < 15:
-        difficulty += 0.3  # Medium, average difficulty
+        length_score = 0.3  # Medium, average difficulty
     elif question_length < 30:
-        difficulty += 0.5  # Longer, more complex
+        length_score = 0.5  # Longer, more complex
     else:
-        difficulty += 0.7  # Very long, likely complex
+        length_score = 0.7  # Very long, likely complex
+    difficulty = length_score
     
     # Heuristic 2: Keyword indicators
-    # Complex questions often use words like "explain", "how", "why", "analyze"
-    complex_keywords = [
-        "explain", "how", "why", "analyze", "compare", "contrast",
-        "evaluate", "summarize", "discuss", "implement", "design",
-        "algorithm", "complex", "optimization", "technical"
-    ]
-    
-    question_lower = question.lower()
-    keyword_count = sum(1 for keyword in complex_keywords if keyword in question_lower)
-    difficulty += (keyword_count * 0.1)
+    # Whole words only ("howdy" is not "how"); each distinct keyword counts once
+    found_keywords = tuple(dict.fromkeys(
+        word for word in _WORD_RE.findall(question.lower()) if word in _COMPLEX_KEYWORDS
+    ))
+    keyword_score = len(found_keywords) * 0.1
+    difficulty += keyword_score
     
     # Heuristic 3: Special characters and punctuation
     # Questions with multiple parts (semicolons, commas) are more complex
-    if "?" in question:
-        if question.count("?") > 1:
-            difficulty += 0.15  # Multiple questions
-    
-    if ";" in question or question.count(",") > 3:
+    question_marks = 0
+    commas = 0
+    has_semicolon = False
+    for mark in _PUNCTUATION_RE.findall(question):
+        if mark == "?":
+            question_marks += 1
+        elif mark == ",":
+            commas += 1
+        else:
+            has_semicolon = True
+    
+    punct_score = 0.0
+    if question_marks > 1:
+        punct_score += 0.15
+        difficulty += 0.15  # Multiple questions
+    
+    if has_semicolon or commas > 3:
+        punct_score += 0.1
         difficulty += 0.1  # Multiple parts
     
     # Normalize difficulty to 0.0 - 1.0 range
     difficulty = min(difficulty, 1.0)
     
-    return difficulty
+    model = select_model(difficulty)
+    
+    return DifficultyReport(
+        difficulty=difficulty,
+        question_length=question_length,
+        length_score=length_score,
+        found_keywords=found_keywords,
+        keyword_score=keyword_score,
+        question_marks=question_marks,
+        commas=commas,
+        has_semicolon=has_semicolon,
+        punct_score=punct_score,
+        model=model,
+        config=get_model_config(model)
+    )
+
+
+def estimate_difficulty(question: str) -> float:
+    """
+    Estimate question difficulty using simple heuristics (see analyze()).
+    
+    Args:
+        question: The user's question as a string
+        
+    Returns:
+        Difficulty score from 0.0 (trivial) to 1.0 (very complex)
+    """
+    
+    return analyze(question).difficulty
 
 
+@functools.lru_cache(maxsize=4096)
 def select_model(difficulty_score: float) -> str:
     """
     Route to the appropriate model based on difficulty.
@@ -88,7 +196,8 @@ def select_model(difficulty_score: float) -> str:
         return "large"
 
 
-def get_model_config(model_name: str) -> dict:
+@functools.lru_cache(maxsize=None)
+def get_model_config(model_name: str) -> MappingProxyType:
     """
     Get configuration parameters for the selected model.
     
@@ -101,26 +210,7 @@ def get_model_config(model_name: str) -> dict:
         model_name: Name of the model ("small" or "large")
         
     Returns:
-        Dictionary with model configuration (cost, latency, etc.)
+        Read-only mapping with model configuration (cost, latency, etc.)
     """
     
-    # Model configurations (estimated values for demonstration)
-    # In production, these would come from actual provider APIs
-    models = {
-        "small": {
-            "name": "GPT-3.5-mini",
-            "cost_per_1k_tokens": 0.0005,  # $0.0005 per 1k tokens
-            "avg_latency_ms": 500,         # ~500ms average
-            "max_tokens": 2048,
-            "quality_threshold": 0.7       # Minimum quality score before escalation
-        },
-        "large": {
-            "name": "GPT-4",
-            "cost_per_1k_tokens": 0.015,   # $0.015 per 1k tokens
-            "avg_latency_ms": 2000,        # ~2000ms average
-            "max_tokens": 4096,
-            "quality_threshold": 0.95      # Higher quality expected
-        }
-    }
-    
-    return models.get(model_name, models["small"])
+    return _MODELS.get(model_name, _MODELS["small"])
@@ -0,0 +1,209 @@
+"""
+Semantic Cache: Reuses answers for questions that are worded differently.
+
+WHY THIS EXISTS:
+- The exact-match AnswerCache misses rewordings, e.g.
+  "How do I print hello world?" vs "how to print hello world"
+- A near-duplicate hit saves a full LLM round-trip (500-2000ms plus tokens)
+
+HOW IT WORKS:
+- Each question becomes a vector of its words and adjacent word pairs
+  (lowercased, common filler words removed, L2-normalized)
+- Similarity is the cosine between vectors (1.0 = same words, same order)
+- A hit also needs the shared words in the same order, so swapping two
+  words ("python vs java" -> "java vs python") never reuses an answer
+- An inverted index (feature -> entries) means only entries sharing at
+  least one word with the new question are compared
+
+WHY NOT NEURAL EMBEDDINGS:
+- Same reasoning as the router: no ML dependencies, fast, transparent
+- Word overlap is enough to catch reworded simple questions, which are
+  the ones this cache is allowed to answer (complex questions bypass it)
+- The threshold is strict on purpose: "hello world in java" must not
+  reuse a generic "hello world" answer
+"""
+
+import json
+import math
+import os
+import re
+from datetime import datetime
+from typing import Optional
+
+from src.answer_cache import schema_version
+
+
+# Filler words that don't change what a question is about
+_STOP_WORDS = frozenset({
+    "a", "an", "the", "is", "are", "was", "were", "be", "do", "does", "did",
+    "i", "you", "we", "it", "my", "me", "to", "of", "in", "on", "for", "with",
+    "and", "or", "what", "how", "can", "could", "would", "should", "please"
+})
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def _content_words(question: str) -> list:
+    """Lowercased words of a question, in order, with filler words removed."""
+    return [word for word in _WORD_RE.findall(question.lower()) if word not in _STOP_WORDS]
+
+
+def _vectorize(question: str) -> dict:
+    """
+    Turn a question into an L2-normalized vector of words and word pairs.
+
+    WHY WORD PAIRS:
+    - Words alone ignore order, so "is python faster than java" and
+      "is java faster than python" would look identical
+    - Adjacent pairs ("python faster" vs "java faster") differ when words
+      are swapped, which pulls the similarity well below the threshold
+    """
+    words = _content_words(question)
+    features = words + [f"{first} {second}" for first, second in zip(words, words[1:])]
+
+    counts = {}
+    for feature in features:
+        counts[feature] = counts.get(feature, 0) + 1
+
+    norm = math.sqrt(sum(count * count for count in counts.values()))
+    if norm == 0:
+        return {}
+    return {feature: count / norm for feature, count in counts.items()}
+
+
+def _same_order(first: list, second: list) -> bool:
+    """
+    Whether the words two questions share appear in the same order.
+
+    Extra or missing words are fine ("how to print hello world" vs
+    "print hello world"), swapped ones are not.
+    """
+    shared = set(first) & set(second)
+
+    def order(words):
+        seen = []
+        for word in words:
+            if word in shared and word not in seen:
+                seen.append(word)
+        return seen
+
+    return order(first) == order(second)
+
+
+class SemanticCache:
+    """
+    Nearest-neighbour answer lookup over previously answered questions.
+
+    Entries are kept in memory and appended to a JSONL file so they
+    survive between runs.
+    """
+
+    def __init__(self, path: str = "output/sem_cache.jsonl", threshold: float = 0.92):
+        """
+        Initialize the cache.
+
+        Args:
+            path: JSONL file where entries are persisted
+            threshold: Minimum cosine similarity for a hit (0.0-1.0)
+        """
+        self.path = path
+        self.threshold = threshold
+        self._entries = None   # Loaded lazily on first use
+        self._index = {}       # feature -> list of entry positions
+
+    def _load(self) -> None:
+        """Read persisted entries and build the inverted index."""
+        self._entries = []
+        self._index = {}
+
+        if not os.path.isfile(self.path):
+            return
+
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        self._add_entry(json.loads(line))
+                    except ValueError:
+                        continue   # Skip a partially written line
+        except OSError as e:
+            print(f"✗ Error reading {self.path}: {e}")
+
+    def _add_entry(self, entry: dict) -> None:
+        """Add an entry to the in-memory index."""
+        entry["vector"] = _vectorize(entry["question"])
+        position = len(self._entries)
+        self._entries.append(entry)
+        for feature in entry["vector"]:
+            self._index.setdefault(feature, []).append(position)
+
+    def lookup(self, question: str) -> Optional[dict]:
+        """
+        Find the most similar cached question.
+
+        Args:
+            question: The user's question
+
+        Returns:
+            Cached entry (answer, quality_score, final_model, similarity),
+            or None if nothing is similar enough or the entry is stale
+        """
+
+        if self._entries is None:
+            self._load()
+
+        vector = _vectorize(question)
+        words = _content_words(question)
+
+        # Accumulate dot products only for entries sharing a feature
+        scores = {}
+        for feature, weight in vector.items():
+            for position in self._index.get(feature, ()):
+                scores[position] = scores.get(position, 0.0) + weight * self._entries[position]["vector"][feature]
+
+        # Best match first; skip candidates whose shared words are reordered
+        for position, similarity in sorted(scores.items(), key=lambda item: item[1], reverse=True):
+            if similarity < self.threshold:
+                return None
+
+            entry = self._entries[position]
+            if not _same_order(words, _content_words(entry["question"])):
+                continue
+            if entry.get("schema") != schema_version(entry["final_model"]):
+                return None
+
+            return dict(entry, similarity=similarity)
+
+        return None
+
+    def add(self, question: str, result: dict) -> None:
+        """
+        Store an answered question.
+
+        Args:
+            question: The user's question
+            result: Result dictionary from the optimizer
+        """
+
+        if self._entries is None:
+            self._load()
+
+        entry = {
+            "question": question,
+            "answer": result["answer"],
+            "quality_score": result["quality_score"],
+            "final_model": result["final_model"],
+            "schema": schema_version(result["final_model"]),
+            "cached_at": datetime.now().isoformat()
+        }
+
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+        except OSError as e:
+            print(f"✗ Error writing {self.path}: {e}")
+
+        self._add_entry(entry)